@@ -1,7 +1,7 @@
 # handlers/analytics.py
 import csv, os, datetime
 
-LOG_PATH = os.path.join(os.path.dirname(__file__), "..", "logs", "qa_events.csv")
+LOG_PATH = os.getenv("QA_LOG_PATH") or os.path.join(os.path.dirname(__file__), "..", "logs", "qa_events.csv")
 
 def log_event(kind: str, text: str, chosen: str | None = None, user_id: int | None = None):
     os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
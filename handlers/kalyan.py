@@ -1,6 +1,7 @@
 # handlers/kalyan.py
 import google.generativeai as genai
 from config import GEMINI_API_KEY
+from utils.gemini import PROMPT_PREFIX
 
 def ask_kalyan(prompt: str, api_key: str | None = None) -> str:
     """
@@ -12,7 +13,7 @@ def ask_kalyan(prompt: str, api_key: str | None = None) -> str:
             return "⚠️ គ្មាន API KEY (GEMINI_API_KEY) ត្រូវបានកំណត់។"
         genai.configure(api_key=key)
         model = genai.GenerativeModel("gemini-pro")
-        full_prompt = "ជាអ្នកជំនួយផ្នែកសិក្សាដែលនិយាយភាសាខ្មែរ។ " + prompt
+        full_prompt = PROMPT_PREFIX + prompt
         resp = model.generate_content(full_prompt)
         return (resp.text or "").strip() or "⚠️ API មិនបង្ហាញអត្ថបទចម្លើយ។"
     except Exception as e:
@@ -127,17 +127,25 @@ async def text_router(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(answer)
 
 # ============ Boot ============
-import os, re, sys, asyncio, hashlib, logging, unicodedata
+import os, re, sys, html, time, asyncio, hashlib, logging, unicodedata
 from typing import Optional
 from dotenv import load_dotenv
 
-from telegram import Update
+from telegram import Update, InlineQueryResultArticle, InputTextMessageContent
 from telegram.constants import ParseMode
 from telegram.ext import (
-    ApplicationBuilder, CommandHandler, MessageHandler,
-    ContextTypes, filters
+    ApplicationBuilder, CommandHandler, MessageHandler, InlineQueryHandler,
+    TypeHandler, ContextTypes, filters
 )
 
+from handlers.analytics import log_event
+from offline.offline import OFFLINE_QA
+from utils.chat_memory import ChatMemory
+from utils.gemini import make_model as make_gemini_model
+from utils.matcher import KB, best_match
+from utils.profiler import SESSIONS as PROFILERS
+from utils.typeahead import Typeahead
+
 # Windows fix
 if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
@@ -150,6 +158,17 @@ WEBHOOK_URL        = (os.getenv("WEBHOOK_URL") or "").strip()
 WEBHOOK_SECRET     = (os.getenv("WEBHOOK_SECRET") or "").strip()
 PORT               = int(os.getenv("PORT", "8080"))
 FORCE_POLLING      = (os.getenv("FORCE_POLLING") or "").lower() in {"1","true","yes"}
+# alternative API hosts (local Bot API server, tools/loadtest.py stubs)
+TELEGRAM_API_URL   = (os.getenv("TELEGRAM_API_URL") or "").strip().rstrip("/")
+GEMINI_API_ENDPOINT= (os.getenv("GEMINI_API_ENDPOINT") or "").strip()
+INLINE_TOP_K       = min(int(os.getenv("INLINE_TOP_K", "8")), 50)  # answerInlineQuery max
+INLINE_CACHE_TIME  = int(os.getenv("INLINE_CACHE_TIME", "300"))  # seconds, per query string
+CHAT_MEMORY_TURNS  = int(os.getenv("CHAT_MEMORY_TURNS", "8"))
+CHAT_MEMORY_TOKENS = int(os.getenv("CHAT_MEMORY_TOKENS", "2000"))
+CHAT_MEMORY_USERS  = int(os.getenv("CHAT_MEMORY_USERS", "5000"))
+CHAT_MEMORY_TTL    = int(os.getenv("CHAT_MEMORY_TTL", "1800"))    # seconds idle
+ADMIN_USER_IDS     = {int(x) for x in re.findall(r"\d+", os.getenv("ADMIN_USER_IDS") or "")}
+PROFILE_MAX_SECONDS= int(os.getenv("PROFILE_MAX_SECONDS", "300"))
 
 if not TELEGRAM_BOT_TOKEN:
     raise SystemExit("⚠️ Missing TELEGRAM_BOT_TOKEN")
@@ -195,170 +214,7 @@ OFFLINE_OUTLINE = """📚 សំណួរដែលអ្នកអាចសួរ
 
 💡 Narirat អាចឆ្លើយសំណួរទាំងនេះបាន ទោះបី API អត់ដំណើរការ!
 """
-
-OFFLINE_QA = {
-    # --- Admin/Staff ---
-        "នាយកសាលា NGS-PL ជានរណា?":
-            "👨‍💼 លោក នាយក ឆុំ សុភក្តិ\n"
-            "• 🗂 ទទួលបន្ទុកការងាររួម\n"
-            "• 🔒 អធិការកិច្ចអចិន្ត្រៃយ៍\n"
-            "• 📡 ទំនាក់ទំនង",
-
-        "នាយិការងឱ្យអ្វីខ្លះ?":
-            "👩‍💼 លោកស្រី នាយិការង វ៉ៅ សំអូន\n"
-            "• 🛠 បច្ចេកទេស\n"
-            "• 🏫 បឋមភូមិ\n"
-            "• 🎨 គេហវិជ្ជា និងសិល្បៈ\n"
-            "• 🛡 សន្តិសុខ, វិន័យ, បរិស្ថាន\n"
-            "• 📋 អធិការកិច្ចគ្រប់មុខ",
-
-        "តួនាទីនាយករង":
-            "👨‍💼 លោក នាយករង យក់ សោភ័ណ\n"
-            "• 📂 រដ្ឋបាល\n"
-            "• 🏛 ទុតិយភូមិ\n"
-            "• 💰 គណនេយ្យ, បេឡា\n"
-            "• 🏅 កីឡា, កសិកម្ម, រោងជាង\n"
-            "• 💻 ព័ត៌មានវិទ្យា\n"
-            "• 🧑‍⚕️ កាកបាទក្រហម-កាយរឹត\n"
-            "• 🛡 សន្តិសុខ និងវិន័យ",
-
-    # --- Personal Info ---
-        "កល្យាណកើតនៅថ្ងៃទីប៉ុន្មាន?":
-            "📅 កល្យាណកើតនៅថ្ងៃទី ១២-មេសា-២០០៥។",
-
-        "កល្យាណត្រូវបានបង្កើតដោយនរណា?":
-            "👤 កល្យាណត្រូវបានបង្កើតឡើងដោយក្រុមសិស្ស NGS-PL។",
-
-        "តើអ្នកណាដឹកនាំក្រុមកល្យាណ?":
-            "👥 អ្នកដឹកនាំក្រុមកល្យាណមានដូចជា៖\n"
-            "👨‍🏫 លោកគ្រូអ៊ុត ណង\n"
-            "👨‍🏫 លោកគ្រូផល អេងលី\n"
-            "👨‍🏫 សម្របសម្រួលដោយលោកគ្រូ៖ សំ មករា",
-    # --- School Info ---
-        "ប្រវត្តិសាលា NGS-PL?":
-            "📜 សាលាត្រូវបានបង្កើតឡើងក្នុងឆ្នាំ ១៩៨០ ជាអនុវិទ្យាល័យ ព្រែកលៀប។\n"
-            "📅 ថ្ងៃ ១២-មេសា-២០០៥ ក្រសួងអប់រំ យុវជន និងកីឡា បានប្រកាសជាវិទ្យាល័យ។\n"
-            "🚀 ឆ្នាំសិក្សា ២០១៧-២០១៨ ចាប់ផ្តើមកម្មវិធីសាលាជំនាន់ថ្មី (ថ្នាក់ទី ៧ និង ៨)\n"
-            "🎯 គោលបំណង៖ កែលម្អគុណភាពអប់រំនៅកម្ពុជា",
-
-        "អគារ ក មានអ្វីខ្លះ?":
-            "🏢 អគារ ក:\n"
-            "• 💻 ICT៖ 3\n"
-            "• 📚 បណ្ណាល័យ៖ 1",
-
-        "អគារ ខ មានអ្វីខ្លះ?":
-            "🏢 អគារ ខ:\n"
-            "• ⚗️ គីមីវិទ្យា៖ 5",
-
-        "អគារ គ មានអ្វីខ្លះ?":
-            "🏢 អគារ គ:\n"
-            "• ⚛️ រូបវិទ្យា៖ 5\n"
-            "• 🗃 ទីចាត់ការ៖ 1\n"
-            "• 🏥 បន្ទប់ពេទ្យ៖ 1\n"
-            "• 🧪 បន្ទប់ប្រីកក្សា៖ 1",
-
-        "អគារ ឃ មានអ្វីខ្លះ?":
-            "🏢 អគារ ឃ:\n"
-            "• ➗ គណិតវិទ្យា៖ 7\n"
-            "• 📝 ភាសាខ្មែរ៖ 7\n"
-            "• 🏺 ប្រវត្តិវិទ្យា៖ 2\n"
-            "• 🌍 ភូមិវិទ្យា៖ 2\n"
-            "• 🌋 ផែនដីវិទ្យា៖ 1\n"
-            "• 🧭 សិលធម៌ពលរដ្ឋ៖ 2",
-        "អគារ ង មានអ្វីខ្លះ?":
-            "🏢 អគារ ង:\n"
-            "• 🧬 ជីវវិទ្យា៖ 5\n"
-            "• 🇬🇧 អង់គ្លេស៖ 7\n"
-            "• 🇫🇷 បារាំង៖ 1\n"
-            "• 🇨🇳 ចិន៖ 1\n"
-            "• 🏛 បន្ទប់ប្រជុំតូច៖ 1",
-
-        "សិស្សចំនួនប៉ុន្មាន?":
-            "👩‍🎓 2024-2025៖ 1470 នាក់\n"
-            "👨‍🎓 2023-2024៖ 1320 នាក់",
-
-        "ចំនួនគ្រូតាមមុខវិជ្ជា?":
-        "👩‍🏫 ចំនួនគ្រូតាមមុខវិជ្ជា៖\n"
-        "• ➗ គណិតវិទ្យា៖ 15\n"
-        "• 📝 ភាសាខ្មែរ៖ 12\n"
-        "• ⚛️ រូបវិទ្យា៖ 9\n"
-        "• ⚗️ គីមីវិទ្យា៖ 9\n"
-        "• 💻 ព័ត៌មានវិទ្យា៖ 6\n"
-        "• 🧭 សិលធម៌-ពលរដ្ឋ៖ 5\n"
-        "• 🧬 ជីវវិទ្យា៖ 9\n"
-        "• 🇬🇧 អង់គ្លេស៖ 9\n"
-        "• 🌍 ភូមិវិទ្យា៖ 4\n"
-        "• 🏺 ប្រវត្តិវិទ្យា៖ 4\n"
-        "• 🌋 ផែនដីវិទ្យា៖ 2\n"
-        "• 🧑‍🎓 បំណិនជីវិត៖ 1\n"
-        "• 🏃‍♂️ អប់រំកាយ៖ 1\n"
-        "• 🇨🇳 ភាសាចិន៖ 2\n"
-        "• 🇫🇷 ភាសាបារាំង៖ 1\n\n"
-        "📊 សរុបគ្រូទាំងអស់៖ 89 នាក់",
-
-    # --- Teaching ---
-        "វិធីសាស្ត្របង្រៀន?":
-        "📚 វិធីសាស្ត្របង្រៀន:\n"
-        "🔄 Flipped Classroom\n"
-        "• 📺 សិក្សាមេរៀននៅផ្ទះ → 👥 រៀនតាមក្រុម → 👨‍🏫 គ្រូជួយពន្យល់\n\n"
-        "🔍 Inquiry-Based Learning (IBL)\n"
-        "• ❓ សួរសំណួរ → 👀 សង្កេត → 🔬 ស្រាវជ្រាវ → 🧪 ពិសោធន៍\n\n"
-        "🛠 Project-Based Learning\n"
-        "• 📁 Project Basic & 🎯 Project-Based Learning → 🧵 ផលិតផលជាក់ស្តែង\n\n"
-        "🧩 Problem-Based Learning\n"
-        "• ⚠️ ចាប់ផ្តើមពីបញ្ហា → 🔍 ស្រាវជ្រាវ → 💡 ដំណោះស្រាយ\n\n"
-        "🌟 5Es Model\n"
-        "• 🎈 Engage → 🧭 Explore → 🗣 Explain → 🧠 Elaborate → 📊 Evaluate\n\n"
-        "🤝 Collaborative Learning\n"
-        "• 👥 ក្រុមតូចៗ → 🔄 រៀនពីគ្នា → 🏫 បរិយាកាសសកម្ម\n\n"
-        "🎨 Teaching Strategies\n"
-        "• 💭 Think-Pair-Share\n"
-        "• 🧩 Jigsaw\n"
-        "• 🗺 Mind Mapping\n"
-        "• 🖼 Gallery Walk\n"
-        "• 🗣 Debate\n"
-        "• ☕️ World Café / 🔄 Carousel Brainstorm",
-
-        "តើ Collaborative Learning មានអ្វី?":
-            "🤝 Collaborative Learning:\n"
-            "• ក្រុមតូចៗ មានតួនាទីច្បាស់\n"
-            "• រៀនពីគ្នាទៅវិញទៅមក\n"
-            "• បរិយាកាសសិក្សាសកម្ម និងចូលរួម",
-
-        # --- Rules ---
-        "តើអាចយកទូរស័ព្ទមកសាលាទេ?":
-            "📵 មិនអនុញ្ញាតឲ្យយកទូរស័ព្ទចូលសាលា",
-
-        "តើសិស្សអាចស្លៀកអាវខ្មៅបានទេ?":
-            "👕 មិនអាចស្លៀកអាវខ្មៅ\n✅ ត្រូវស្លៀកអាវពណ៌ស",
-
-        "តើមកក្រោយម៉ោង ៧:៣០ អាចចូលទេ?":
-            "⏰ មកក្រោយម៉ោង ៧:៣០ មិនអនុញ្ញាតឱ្យចូល",
-
-        # --- Exams ---
-        "ត្រូវយកអ្វីចូលបន្ទប់ប្រឡង?":
-        "📝 ត្រូវយក:\n"
-        "• 🖊 ប៊ិក (ខ្មៅ ឬ ខៀវ)\n"
-        "• 📏 បន្ទាត់\n"
-        "• 🧲 ដែកឈាន\n"
-        "• 🆔 ប័ណ្ណសម្គាល់ \n"
-        "• 🧃 ទឹកផ្អែម (មិនអនុញ្ញាត)",
-
-    "ច្បាប់សម្រាប់បេក្ខជន?":
-        "🎓 បទបញ្ជាពេលប្រឡង:\n"
-        "• ⏰ មកមុនម៉ោង ៦:៤៥ ព្រឹក / ១២:៤៥ រសៀល\n"
-        "• 👕 ពាក់ឯកសណ្ឋានសិស្សឲ្យត្រឹមត្រូវ\n"
-        "• 🖊 យកប៊ិក, 📏 បន្ទាត់, 🧲 ដែកឈាន\n"
-        "• 🚪 មិនអាចចូលក្រោយចាប់ផ្តើម\n"
-        "• 🎒 ហាមយកកាបូប, អាវុធ, ឧបករណ៍អេឡិចត្រូនិច\n"
-        "• 📵 ហាមទូរស័ព្ទ\n"
-        "• 📄 ហាមសំណៅឯកសារផ្សេងៗ\n"
-        "• 🧼 ហាមទឹកលុប\n"
-        "• 🚫 ហាមចម្លង ឬចែកចម្លើយ\n"
-        "• 🔒 មិនអាចចេញពីបន្ទប់មុនពេលកំណត់\n"
-        "• 🤫 រក្សាសុភាព និងសុចរិតភាព\n"
-        "• 🧠 ប្រើចំណេះដឹងផ្ទាល់ខ្លួនដោយស្មោះត្រង់",
-}
+# OFFLINE_QA (the answers) lives in offline/offline.py, shared with utils.matcher
 
 # Normalization
 def normalize_kh(text: str) -> str:
@@ -387,17 +243,36 @@ async def answer_offline(msg, text: str) -> bool:
             return True
     return False
 
+# Inline typeahead (outline questions first, then the rest of OFFLINE_QA)
+def _inline_entries() -> list[tuple[str, str]]:
+    answers = {normalize_kh(q): (q, a) for q, a in OFFLINE_QA.items()}
+    seen, out = set(), []
+    for q in _questions_from_outline() + list(OFFLINE_QA):
+        qn = normalize_kh(q)
+        if qn in answers and qn not in seen:
+            seen.add(qn)
+            out.append(answers[qn])
+    return out
+
+_TYPEAHEAD = Typeahead(
+    _inline_entries(), normalize_kh,
+    segmenter=KB.seg, keep=INLINE_TOP_K,
+)
+
 # ============ Gemini ============
 _GENAI_READY = False
 try:
     if GEMINI_API_KEY:
-        import google.generativeai as genai
-        genai.configure(api_key=GEMINI_API_KEY)
-        _model = genai.GenerativeModel("gemini-1.5-flash")
+        _model = make_gemini_model(GEMINI_API_KEY, GEMINI_API_ENDPOINT)
         _GENAI_READY = True
 except Exception as e:
     log.warning("Gemini not ready: %s", e)
 
+_MEMORY = ChatMemory(
+    max_turns=CHAT_MEMORY_TURNS, max_tokens=CHAT_MEMORY_TOKENS,
+    max_users=CHAT_MEMORY_USERS, ttl=CHAT_MEMORY_TTL,
+)
+
 # ============ Handlers ============
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     args = context.args or []
@@ -419,7 +294,8 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "• 🔹 វាយសារ​ធម្មតា — ខ្ញុំនឹងឆ្លើយតាម Gemini API (Online)\n\n"
         "🔰 ពាក្យបញ្ជា:\n"
         "• /start — បង្ហាញសារ​ស្វាគមន៍\n"
-        "• /schoolinfo — បង្ហាញសំណួរ Offline (ចុចលើតំណខៀវដើម្បីឃើញចម្លើយ)\n\n"
+        "• /schoolinfo — បង្ហាញសំណួរ Offline (ចុចលើតំណខៀវដើម្បីឃើញចម្លើយ)\n"
+        "• /reset — ចាប់ផ្តើមការសន្ទនាជាមួយ Gemini ឡើងវិញ\n\n"
         "✏️ កល្យាណ បង្កើតដោយសិស្ស NGS PREAKLEAP\n"
         "📞 https://t.me/Cheukeat"
     )
@@ -436,29 +312,145 @@ async def schoolinfo(update: Update, context: ContextTypes.DEFAULT_TYPE):
             lines_out.append(line)
     await update.message.reply_text("\n".join(lines_out), parse_mode=ParseMode.HTML)
 
+def _memory_key(update: Update) -> tuple[int, int]:
+    # per user *in* a chat: a private thread never leaks into group replies
+    return (update.effective_chat.id, update.effective_user.id)
+
 async def text_router(update: Update, context: ContextTypes.DEFAULT_TYPE):
     text = (update.message.text or "").strip()
     if not text: return
     if await answer_offline(update.message, text):
         return
+    # fuzzy fallback over utils.matcher.KB (OFFLINE_QA, OFFLINE, schoolinfo.json)
+    match = best_match(text)
+    if match:
+        await update.message.reply_text(f"❓ {match['key']}\n\n{match['reply']}")
+        return
+    log_event("gemini", text, user_id=update.effective_user.id)  # offline miss; feeds tools/pregenerate.py
     if not _GENAI_READY:
         await update.message.reply_text("⚠️ GEMINI_API_KEY មិនត្រឹមត្រូវ។")
         return
     try:
-        resp = _model.generate_content(text)
-        answer = (resp.text or "").strip() or "❌ API មិនឆ្លើយតប។"
+        key = _memory_key(update)
+        resp = _model.generate_content(_MEMORY.history(key) + [{"role": "user", "parts": [text]}])
+        answer = (resp.text or "").strip()
+        if answer:
+            _MEMORY.add_exchange(key, text, answer)
+        else:
+            answer = "❌ API មិនឆ្លើយតប។"
     except Exception as e:
         answer = f"⚠️ កំហុស API: {e}"
     await update.message.reply_text(answer)
 
+async def reset(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    _MEMORY.clear(_memory_key(update))
+    await update.message.reply_text("🧹 បានសម្អាតប្រវត្តិសន្ទនា។")
+
+async def inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    iq = update.inline_query
+    results = []
+    for i in _TYPEAHEAD.search(iq.query, k=INLINE_TOP_K):
+        q, a = _TYPEAHEAD.entries[i]
+        results.append(InlineQueryResultArticle(
+            id=_qid(q),
+            title=q,
+            description=a.split("\n", 1)[0][:100],
+            input_message_content=InputTextMessageContent(f"❓ {q}\n\n{a}"),
+        ))
+    # same query string → same results for everyone, so let Telegram cache it
+    await iq.answer(results, cache_time=INLINE_CACHE_TIME, is_personal=False)
+
+# ============ Profiling (admin) ============
+# Only registered when ADMIN_USER_IDS is set; nothing is traced until /profile runs.
+_PROFILE_COUNTER_GROUP = 99   # after the real handlers, so an update counts once it is done
+_profile: dict | None = None  # {"session", "chat_id", "updates_left", "updates", "task"}
+
+class _ProfileCounter(TypeHandler):
+    def check_update(self, update: object) -> bool:
+        return _profile is not None and _profile["updates_left"] is not None
+
+async def _count_update(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    _profile["updates"] += 1
+    _profile["updates_left"] -= 1
+    if _profile["updates_left"] <= 0:
+        await _finish_profile(context.bot)
+
+async def _profile_timeout(bot, seconds: int):
+    await asyncio.sleep(seconds)
+    await _finish_profile(bot)
+
+async def _finish_profile(bot):
+    global _profile
+    run, _profile = _profile, None
+    if run is None:
+        return
+    if run["task"] is not asyncio.current_task():
+        run["task"].cancel()
+    sess = run["session"]
+    sess.stop()
+    head = f"⏱ {sess.mode}: {sess.stopped - sess.started:.1f}s"
+    if run["updates_left"] is not None:
+        head += f", {run['updates']} updates"
+    data = sess.dump()
+    if not data:  # e.g. an immediate /profile stop; Telegram rejects empty files
+        await bot.send_message(run["chat_id"], f"{head}\n⚠️ មិនមានទិន្នន័យ profile ទេ។")
+        return
+    body = html.escape("\n".join(sess.top(15)))[:3800]
+    await bot.send_message(run["chat_id"], f"{head}\n<pre>{body}</pre>", parse_mode=ParseMode.HTML)
+    await bot.send_document(run["chat_id"], document=data,
+                            filename=f"profile-{int(time.time())}.{sess.ext}")
+
+async def profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/profile [30s | 200u] [sample]  ·  /profile stop"""
+    global _profile
+    args = [a.lower() for a in (context.args or [])]
+    if args[:1] == ["stop"]:
+        if _profile is None:
+            await update.message.reply_text("ℹ️ មិនមាន profiling កំពុងដំណើរការ។")
+        else:
+            await _finish_profile(context.bot)
+        return
+    if _profile is not None:
+        await update.message.reply_text("⏳ profiling កំពុងដំណើរការរួចហើយ (/profile stop)។")
+        return
+
+    amount = next((a for a in args if a[:1].isdigit()), "30s")
+    m = re.fullmatch(r"(\d+)([su]?)", amount)
+    if not m or int(m.group(1)) == 0:
+        await update.message.reply_text("ℹ️ /profile [30s | 200u] [sample] — /profile stop")
+        return
+    n, per_update = int(m.group(1)), m.group(2) == "u"
+    sess = PROFILERS["sample" if "sample" in args else "cprofile"]()
+    seconds = PROFILE_MAX_SECONDS if per_update else min(n, PROFILE_MAX_SECONDS)
+    what = f"{n} updates" if per_update else f"{seconds}s"
+    await update.message.reply_text(f"▶️ {sess.mode} profiling: {what}")
+
+    sess.start()
+    _profile = {
+        "session": sess,
+        "chat_id": update.effective_chat.id,
+        # +1: this /profile update reaches the counter group too
+        "updates_left": n + 1 if per_update else None,
+        "updates": -1,
+        "task": context.application.create_task(_profile_timeout(context.bot, seconds)),
+    }
+
 # ============ Boot ============
 def main():
-    app = ApplicationBuilder().token(TELEGRAM_BOT_TOKEN).build()
+    builder = ApplicationBuilder().token(TELEGRAM_BOT_TOKEN)
+    if TELEGRAM_API_URL:
+        builder = builder.base_url(f"{TELEGRAM_API_URL}/bot").base_file_url(f"{TELEGRAM_API_URL}/file/bot")
+    app = builder.build()
 
     # handlers
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("schoolinfo", schoolinfo))
+    app.add_handler(CommandHandler("reset", reset))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, text_router))
+    app.add_handler(InlineQueryHandler(inline_query))
+    if ADMIN_USER_IDS:
+        app.add_handler(CommandHandler("profile", profile, filters=filters.User(user_id=ADMIN_USER_IDS)))
+        app.add_handler(_ProfileCounter(Update, _count_update), group=_PROFILE_COUNTER_GROUP)
 
     # --- decide webhook vs polling ---
     use_webhook = (not FORCE_POLLING)
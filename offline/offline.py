@@ -13,3 +13,169 @@ OFFLINE = {
   "ប្រឡង": "🎓 បទបញ្ជាពេលប្រឡង:\n🕖 ១. មកមុន ៦:៤៥ ព្រឹក / ១២:៤៥ រសៀល\n🎽 ២. ពាក់ឯកសណ្ឋានសិស្ស\n🖊 ៣. យកប៊ិក បន្ទាត់ ដែកឈាន\n🚪 ៤. មិនអាចចូលក្រោយចាប់ផ្តើម\n🎒 ៥. ហាមយកកាបូប អាវុធ ឧបករណ៍អេឡិចត្រូនិច\n📱 ៦. ហាមទូរស័ព្ទ\n📄 ៧. ហាមសំណៅឯកសារផ្សេងៗ\n🧼 ៨. ហាមទឹកលុប\n🚫 ៩. ហាមចម្លង ចែកចម្លើយ\n🔒 ១០. មិនអាចចេញពីបន្ទប់មុនពេលកំណត់",
   "សំណួរបែប Offline": "📚 សំណួរដែលអ្នកអាចសួរបាននៅពេល Offline:\n\n👨‍🏫 អំពីគ្រូ និង នាយក\n- នាយកសាលា NGS-PL ជានរណា?\n- នាយិការងឱ្យអ្វីខ្លះ?\n- តួនាទីនាយករង\n\n🏫 ព័ត៌មានអគារ និងសាលា\n- ប្រវត្តិសាលា NGS-PL\n- អគារ ICT មានអ្វីខ្លះ?\n- សិស្សចំនួនប៉ុន្មាន?\n- គ្រូសរុប\n\n🎓 អំពី កល្យាណ\n- កាលបរិច្ឆេទកំណើត\n- បង្កើតដោយនរណា?\n- មានសង្សារទេ?\n\n📋 វិធីបង្រៀន\n- វិធីសាស្ត្របង្រៀន\n- តើ Flipped Classroom មានអ្វី?\n\n🛡 បទបញ្ជា និងវិន័យ\n- តើអាចយកទូរស័ព្ទមកសាលាទេ?\n- តើសិស្សអាចស្លៀកអាវខ្មៅបានទេ?\n- តើមកក្រោយម៉ោង ៧:៣០ អាចចូលទេ?\n\n🧪 ព័ត៌មានប្រឡង\n- ត្រូវយកអ្វីចូលបន្ទប់ប្រឡង?\n- ច្បាប់សម្រាប់បេក្ខជន\n\n💡 Narirat អាចឆ្លើយសំណួរទាំងនេះបាន ទោះបី API អត់ដំណើរការ!"
 }
+
+# Full questions answered by main.py (exact match, inline typeahead);
+# utils.matcher also loads them, under OFFLINE.
+OFFLINE_QA = {
+    # --- Admin/Staff ---
+        "នាយកសាលា NGS-PL ជានរណា?":
+            "👨‍💼 លោក នាយក ឆុំ សុភក្តិ\n"
+            "• 🗂 ទទួលបន្ទុកការងាររួម\n"
+            "• 🔒 អធិការកិច្ចអចិន្ត្រៃយ៍\n"
+            "• 📡 ទំនាក់ទំនង",
+
+        "នាយិការងឱ្យអ្វីខ្លះ?":
+            "👩‍💼 លោកស្រី នាយិការង វ៉ៅ សំអូន\n"
+            "• 🛠 បច្ចេកទេស\n"
+            "• 🏫 បឋមភូមិ\n"
+            "• 🎨 គេហវិជ្ជា និងសិល្បៈ\n"
+            "• 🛡 សន្តិសុខ, វិន័យ, បរិស្ថាន\n"
+            "• 📋 អធិការកិច្ចគ្រប់មុខ",
+
+        "តួនាទីនាយករង":
+            "👨‍💼 លោក នាយករង យក់ សោភ័ណ\n"
+            "• 📂 រដ្ឋបាល\n"
+            "• 🏛 ទុតិយភូមិ\n"
+            "• 💰 គណនេយ្យ, បេឡា\n"
+            "• 🏅 កីឡា, កសិកម្ម, រោងជាង\n"
+            "• 💻 ព័ត៌មានវិទ្យា\n"
+            "• 🧑‍⚕️ កាកបាទក្រហម-កាយរឹត\n"
+            "• 🛡 សន្តិសុខ និងវិន័យ",
+
+    # --- Personal Info ---
+        "កល្យាណកើតនៅថ្ងៃទីប៉ុន្មាន?":
+            "📅 កល្យាណកើតនៅថ្ងៃទី ១២-មេសា-២០០៥។",
+
+        "កល្យាណត្រូវបានបង្កើតដោយនរណា?":
+            "👤 កល្យាណត្រូវបានបង្កើតឡើងដោយក្រុមសិស្ស NGS-PL។",
+
+        "តើអ្នកណាដឹកនាំក្រុមកល្យាណ?":
+            "👥 អ្នកដឹកនាំក្រុមកល្យាណមានដូចជា៖\n"
+            "👨‍🏫 លោកគ្រូអ៊ុត ណង\n"
+            "👨‍🏫 លោកគ្រូផល អេងលី\n"
+            "👨‍🏫 សម្របសម្រួលដោយលោកគ្រូ៖ សំ មករា",
+    # --- School Info ---
+        "ប្រវត្តិសាលា NGS-PL?":
+            "📜 សាលាត្រូវបានបង្កើតឡើងក្នុងឆ្នាំ ១៩៨០ ជាអនុវិទ្យាល័យ ព្រែកលៀប។\n"
+            "📅 ថ្ងៃ ១២-មេសា-២០០៥ ក្រសួងអប់រំ យុវជន និងកីឡា បានប្រកាសជាវិទ្យាល័យ។\n"
+            "🚀 ឆ្នាំសិក្សា ២០១៧-២០១៨ ចាប់ផ្តើមកម្មវិធីសាលាជំនាន់ថ្មី (ថ្នាក់ទី ៧ និង ៨)\n"
+            "🎯 គោលបំណង៖ កែលម្អគុណភាពអប់រំនៅកម្ពុជា",
+
+        "អគារ ក មានអ្វីខ្លះ?":
+            "🏢 អគារ ក:\n"
+            "• 💻 ICT៖ 3\n"
+            "• 📚 បណ្ណាល័យ៖ 1",
+
+        "អគារ ខ មានអ្វីខ្លះ?":
+            "🏢 អគារ ខ:\n"
+            "• ⚗️ គីមីវិទ្យា៖ 5",
+
+        "អគារ គ មានអ្វីខ្លះ?":
+            "🏢 អគារ គ:\n"
+            "• ⚛️ រូបវិទ្យា៖ 5\n"
+            "• 🗃 ទីចាត់ការ៖ 1\n"
+            "• 🏥 បន្ទប់ពេទ្យ៖ 1\n"
+            "• 🧪 បន្ទប់ប្រីកក្សា៖ 1",
+
+        "អគារ ឃ មានអ្វីខ្លះ?":
+            "🏢 អគារ ឃ:\n"
+            "• ➗ គណិតវិទ្យា៖ 7\n"
+            "• 📝 ភាសាខ្មែរ៖ 7\n"
+            "• 🏺 ប្រវត្តិវិទ្យា៖ 2\n"
+            "• 🌍 ភូមិវិទ្យា៖ 2\n"
+            "• 🌋 ផែនដីវិទ្យា៖ 1\n"
+            "• 🧭 សិលធម៌ពលរដ្ឋ៖ 2",
+        "អគារ ង មានអ្វីខ្លះ?":
+            "🏢 អគារ ង:\n"
+            "• 🧬 ជីវវិទ្យា៖ 5\n"
+            "• 🇬🇧 អង់គ្លេស៖ 7\n"
+            "• 🇫🇷 បារាំង៖ 1\n"
+            "• 🇨🇳 ចិន៖ 1\n"
+            "• 🏛 បន្ទប់ប្រជុំតូច៖ 1",
+
+        "សិស្សចំនួនប៉ុន្មាន?":
+            "👩‍🎓 2024-2025៖ 1470 នាក់\n"
+            "👨‍🎓 2023-2024៖ 1320 នាក់",
+
+        "ចំនួនគ្រូតាមមុខវិជ្ជា?":
+        "👩‍🏫 ចំនួនគ្រូតាមមុខវិជ្ជា៖\n"
+        "• ➗ គណិតវិទ្យា៖ 15\n"
+        "• 📝 ភាសាខ្មែរ៖ 12\n"
+        "• ⚛️ រូបវិទ្យា៖ 9\n"
+        "• ⚗️ គីមីវិទ្យា៖ 9\n"
+        "• 💻 ព័ត៌មានវិទ្យា៖ 6\n"
+        "• 🧭 សិលធម៌-ពលរដ្ឋ៖ 5\n"
+        "• 🧬 ជីវវិទ្យា៖ 9\n"
+        "• 🇬🇧 អង់គ្លេស៖ 9\n"
+        "• 🌍 ភូមិវិទ្យា៖ 4\n"
+        "• 🏺 ប្រវត្តិវិទ្យា៖ 4\n"
+        "• 🌋 ផែនដីវិទ្យា៖ 2\n"
+        "• 🧑‍🎓 បំណិនជីវិត៖ 1\n"
+        "• 🏃‍♂️ អប់រំកាយ៖ 1\n"
+        "• 🇨🇳 ភាសាចិន៖ 2\n"
+        "• 🇫🇷 ភាសាបារាំង៖ 1\n\n"
+        "📊 សរុបគ្រូទាំងអស់៖ 89 នាក់",
+
+    # --- Teaching ---
+        "វិធីសាស្ត្របង្រៀន?":
+        "📚 វិធីសាស្ត្របង្រៀន:\n"
+        "🔄 Flipped Classroom\n"
+        "• 📺 សិក្សាមេរៀននៅផ្ទះ → 👥 រៀនតាមក្រុម → 👨‍🏫 គ្រូជួយពន្យល់\n\n"
+        "🔍 Inquiry-Based Learning (IBL)\n"
+        "• ❓ សួរសំណួរ → 👀 សង្កេត → 🔬 ស្រាវជ្រាវ → 🧪 ពិសោធន៍\n\n"
+        "🛠 Project-Based Learning\n"
+        "• 📁 Project Basic & 🎯 Project-Based Learning → 🧵 ផលិតផលជាក់ស្តែង\n\n"
+        "🧩 Problem-Based Learning\n"
+        "• ⚠️ ចាប់ផ្តើមពីបញ្ហា → 🔍 ស្រាវជ្រាវ → 💡 ដំណោះស្រាយ\n\n"
+        "🌟 5Es Model\n"
+        "• 🎈 Engage → 🧭 Explore → 🗣 Explain → 🧠 Elaborate → 📊 Evaluate\n\n"
+        "🤝 Collaborative Learning\n"
+        "• 👥 ក្រុមតូចៗ → 🔄 រៀនពីគ្នា → 🏫 បរិយាកាសសកម្ម\n\n"
+        "🎨 Teaching Strategies\n"
+        "• 💭 Think-Pair-Share\n"
+        "• 🧩 Jigsaw\n"
+        "• 🗺 Mind Mapping\n"
+        "• 🖼 Gallery Walk\n"
+        "• 🗣 Debate\n"
+        "• ☕️ World Café / 🔄 Carousel Brainstorm",
+
+        "តើ Collaborative Learning មានអ្វី?":
+            "🤝 Collaborative Learning:\n"
+            "• ក្រុមតូចៗ មានតួនាទីច្បាស់\n"
+            "• រៀនពីគ្នាទៅវិញទៅមក\n"
+            "• បរិយាកាសសិក្សាសកម្ម និងចូលរួម",
+
+        # --- Rules ---
+        "តើអាចយកទូរស័ព្ទមកសាលាទេ?":
+            "📵 មិនអនុញ្ញាតឲ្យយកទូរស័ព្ទចូលសាលា",
+
+        "តើសិស្សអាចស្លៀកអាវខ្មៅបានទេ?":
+            "👕 មិនអាចស្លៀកអាវខ្មៅ\n✅ ត្រូវស្លៀកអាវពណ៌ស",
+
+        "តើមកក្រោយម៉ោង ៧:៣០ អាចចូលទេ?":
+            "⏰ មកក្រោយម៉ោង ៧:៣០ មិនអនុញ្ញាតឱ្យចូល",
+
+        # --- Exams ---
+        "ត្រូវយកអ្វីចូលបន្ទប់ប្រឡង?":
+        "📝 ត្រូវយក:\n"
+        "• 🖊 ប៊ិក (ខ្មៅ ឬ ខៀវ)\n"
+        "• 📏 បន្ទាត់\n"
+        "• 🧲 ដែកឈាន\n"
+        "• 🆔 ប័ណ្ណសម្គាល់ \n"
+        "• 🧃 ទឹកផ្អែម (មិនអនុញ្ញាត)",
+
+    "ច្បាប់សម្រាប់បេក្ខជន?":
+        "🎓 បទបញ្ជាពេលប្រឡង:\n"
+        "• ⏰ មកមុនម៉ោង ៦:៤៥ ព្រឹក / ១២:៤៥ រសៀល\n"
+        "• 👕 ពាក់ឯកសណ្ឋានសិស្សឲ្យត្រឹមត្រូវ\n"
+        "• 🖊 យកប៊ិក, 📏 បន្ទាត់, 🧲 ដែកឈាន\n"
+        "• 🚪 មិនអាចចូលក្រោយចាប់ផ្តើម\n"
+        "• 🎒 ហាមយកកាបូប, អាវុធ, ឧបករណ៍អេឡិចត្រូនិច\n"
+        "• 📵 ហាមទូរស័ព្ទ\n"
+        "• 📄 ហាមសំណៅឯកសារផ្សេងៗ\n"
+        "• 🧼 ហាមទឹកលុប\n"
+        "• 🚫 ហាមចម្លង ឬចែកចម្លើយ\n"
+        "• 🔒 មិនអាចចេញពីបន្ទប់មុនពេលកំណត់\n"
+        "• 🤫 រក្សាសុភាព និងសុចរិតភាព\n"
+        "• 🧠 ប្រើចំណេះដឹងផ្ទាល់ខ្លួនដោយស្មោះត្រង់",
+}
@@ -0,0 +1,35 @@
+# utils/bm25.py
+from math import log
+
+import pytest
+
+from utils.bm25 import BM25Index
+
+DOCS = [
+    ["សាលា", "ប្រវត្តិ", "សាលា"],
+    ["សិស្ស", "ចំនួន"],
+    ["គ្រូ", "សិស្ស", "បង្រៀន", "ថ្នាក់", "រៀន"],
+]
+
+def test_idf_rarer_is_higher():
+    idx = BM25Index(DOCS)
+    assert idx.idf["ប្រវត្តិ"] > idx.idf["សិស្ស"] > 0
+
+def test_search_only_docs_sharing_a_token():
+    idx = BM25Index(DOCS)
+    assert [i for _, i in idx.search(["សិស្ស"])] == [1, 2]  # shorter doc first
+    assert idx.search(["ប្រឡង"]) == []
+    assert len(idx.search(["សិស្ស"], k=1)) == 1
+
+def test_repeated_query_tokens_count_once():
+    idx = BM25Index(DOCS)
+    assert idx.search(["សាលា", "សាលា"]) == idx.search(["សាលា"])
+
+def test_idf_sum_counts_unseen_tokens_at_full_idf():
+    idx = BM25Index(DOCS)
+    unseen = log(1 + (3 + 0.5) / 0.5)
+    assert idx.idf_sum(["សិស្ស", "ប្រឡង"]) == pytest.approx(idx.idf["សិស្ស"] + unseen)
+
+def test_empty_index():
+    idx = BM25Index([])
+    assert idx.search(["សាលា"]) == []
@@ -0,0 +1,68 @@
+# utils/chat_memory.py
+from utils.chat_memory import ChatMemory, approx_tokens
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+    def __call__(self):
+        return self.t
+
+def _texts(mem, key):
+    return [(h["role"], h["parts"][0]) for h in mem.history(key)]
+
+def test_history_in_generate_content_format():
+    mem = ChatMemory()
+    mem.add_exchange(1, "q", "a")
+    assert mem.history(1) == [{"role": "user", "parts": ["q"]}, {"role": "model", "parts": ["a"]}]
+    assert mem.history(2) == []
+
+def test_ring_buffer_keeps_last_turns():
+    mem = ChatMemory(max_turns=4)
+    for i in range(3):
+        mem.add_exchange(1, f"q{i}", f"a{i}")
+    assert _texts(mem, 1) == [("user", "q1"), ("model", "a1"), ("user", "q2"), ("model", "a2")]
+
+def test_odd_max_turns_rounds_up_to_whole_exchanges():
+    mem = ChatMemory(max_turns=1)
+    mem.add_exchange(1, "q0", "a0")
+    mem.add_exchange(1, "q1", "a1")
+    assert _texts(mem, 1) == [("user", "q1"), ("model", "a1")]
+
+def test_zero_max_turns_disables_memory():
+    mem = ChatMemory(max_turns=0)
+    mem.add_exchange(1, "q", "a")
+    assert mem.history(1) == [] and len(mem) == 0
+
+def test_token_budget_trims_oldest_whole_exchange():
+    long = "x" * 30  # 11 tokens
+    mem = ChatMemory(max_turns=8, max_tokens=3 * approx_tokens(long))
+    mem.add_exchange(1, long, long)
+    mem.add_exchange(1, "q", long)
+    # over budget: the first user turn goes, then its dangling model turn
+    assert _texts(mem, 1) == [("user", "q"), ("model", long)]
+
+def test_ttl_forgets_idle_sessions():
+    clock = Clock()
+    mem = ChatMemory(ttl=60, clock=clock)
+    mem.add_exchange(1, "q", "a")
+    clock.t = 59
+    assert mem.history(1)
+    clock.t = 120
+    assert mem.history(1) == []
+
+def test_lru_evicts_least_recent():
+    clock = Clock()
+    mem = ChatMemory(max_users=2, clock=clock)
+    mem.add_exchange(1, "q", "a")
+    mem.add_exchange(2, "q", "a")
+    mem.add_exchange(1, "q", "a")  # 1 is now most recent
+    mem.add_exchange(3, "q", "a")
+    assert len(mem) == 2
+    assert mem.history(2) == [] and mem.history(1) and mem.history(3)
+
+def test_clear_and_tuple_keys():
+    mem = ChatMemory()
+    mem.add_exchange((10, 1), "q", "a")
+    assert mem.history((20, 1)) == []  # same user, other chat
+    mem.clear((10, 1))
+    assert mem.history((10, 1)) == []
@@ -0,0 +1,95 @@
+# Parity of the unified matcher's presets with the former matchers:
+# "fuzzy" = old utils/matcher.best_match, "brain_school" = old offline/brain_school.
+# Expected values were captured from those implementations on offline/offline.py's
+# OFFLINE (pinned here; the live KB also has OFFLINE_QA and schoolinfo.json);
+# deliberate changes since then are marked inline.
+import pytest
+
+from offline.offline import OFFLINE
+from utils.matcher import KnowledgeBase, Matcher
+
+KB = KnowledgeBase(OFFLINE)
+
+# query: (fuzzy best key, score), (brain_school best key, score)
+BEST = {
+    # brain_school: keyword boost weighted by word IDF (was 1.7603 / 2.5265)
+    "តើសិស្សចំនួនប៉ុន្មាន?": (None, ("សិស្ស", 1.5249)),
+    # ...and a generic shared word (សាលា) no longer carries the match
+    "តើនាយកសាលាជានរណា": (None, None),
+    # fuzzy: shared STOPWORDS also strip ជា/នរណា/ប៉ុន្មាន (was 1.0508 / 1.1083)
+    "លោកនាយកជានរណា": (("លោកនាយក", 2.1222), ("លោកនាយក", 2.3508)),
+    "ទូរស័ព្ទ": (None, None),
+    "ប្រឡង": (("ប្រឡង", 2.1072), ("ប្រឡង", 3.8072)),
+    "អគារ ក": (("អគារ", 1.2148), ("អគារ", 2.9148)),
+    "វិធីបង្រៀន": (("វិធីបង្រៀន", 2.1), ("វិធីបង្រៀន", 3.4)),
+    "សួស្តី": (("សួស្តី", 2.1774), ("សួស្តី", 3.8774)),
+    "កល្យាណកើតថ្ងៃណា": (None, ("កល្យាណ", 2.0505)),
+    "នាយិការង": (("នាយិកា", 1.506), ("នាយិកា", 2.606)),
+    "គ្រូសរុបប៉ុន្មាន": (("គ្រូសរុប", 2.3118), ("គ្រូសរុប", 2.4083)),
+    "xyz": (None, None),
+    "បទបញ្ជា": (None, ("បទបញ្ជាផ្ទៃក្នុង", 2.3845)),
+    "ប្រវត្តិសាលា NGS": (("ប្រវត្តិសាលា", 1.5433), ("ប្រវត្តិសាលា", 2.8433)),
+    "ហេលូ": (None, None),
+}
+
+SUGGEST = {
+    "លោកនាយកជានរណា": ["លោកនាយក", "នាយិកា", "អគារ", "សួស្តី"],
+    "ប្រឡង": ["ប្រឡង", "ប្រវត្តិសាលា", "អគារ", "សួស្តី"],
+    "នាយិការង": ["នាយិកា", "លោកនាយក", "អគារ", "សួស្តី"],
+}
+
+def _pair(res):
+    return res and (res["key"], round(res["score"], 4))
+
+@pytest.mark.parametrize("query", list(BEST))
+def test_fuzzy_preset_matches_old_utils_matcher(query):
+    assert _pair(Matcher("fuzzy", KB).best_match(query)) == BEST[query][0]
+
+@pytest.mark.parametrize("query", list(BEST))
+def test_brain_school_preset_matches_old_brain_school(query):
+    assert _pair(Matcher("brain_school", KB).best_match(query)) == BEST[query][1]
+
+@pytest.mark.parametrize("query", list(SUGGEST))
+def test_top_suggestions(query):
+    assert Matcher("fuzzy", KB).top_suggestions(query) == SUGGEST[query]
+    assert Matcher("brain_school", KB).top_suggestions(query) == SUGGEST[query][:3]
+
+def test_match_many_equals_best_match():
+    m = Matcher("brain_school", KB)
+    queries = list(BEST) + list(BEST)
+    assert m.match_many(queries) == [m.best_match(q) for q in queries]
+
+def test_explain_parts_sum_to_score():
+    res = Matcher("brain_school", KB).best_match("លោកនាយកជានរណា", explain=True)
+    assert set(res["parts"]) == {"key_ngram", "reply_ngram", "lev", "boost"}
+    assert sum(res["parts"].values()) == pytest.approx(res["score"])
+
+BM25 = {
+    "លោកនាយកជានរណា": "លោកនាយក",
+    "តើសិស្សចំនួនប៉ុន្មាន": "សិស្ស",
+    "វិធីបង្រៀន": "វិធីបង្រៀន",
+    "បទបញ្ជា": "បទបញ្ជាផ្ទៃក្នុង",
+    # off-topic: used to match on reply words / pronouns
+    "ហេតុអ្វីមេឃពណ៌ខៀវ": None,
+    "តើខ្ញុំគួររៀនម៉េច": None,
+    "ម៉ោងប៉ុន្មាន": None,
+    "ទូរស័ព្ទ": None,
+}
+
+@pytest.mark.parametrize("query", list(BM25))
+def test_bm25_preset(query):
+    res = Matcher("bm25", KB).best_match(query)
+    assert (res and res["key"]) == BM25[query]
+
+def test_live_kb_serves_offline_qa_typos():
+    import utils.matcher as live
+    assert "នាយកសាលា NGS-PL ជានរណា?" in live.KB.data and "សួស្តី" in live.KB.data
+    assert Matcher("fuzzy", live.KB).best_match("នាយកសាលាNGS-PLានរណា")["key"] == "នាយកសាលា NGS-PL ជានរណា?"
+
+def test_long_message_skips_levenshtein(monkeypatch):
+    import utils.matcher as live
+    def boom(a, b):
+        raise AssertionError("full Levenshtein on a long message")
+    monkeypatch.setattr(live, "_HAS_RF", False)  # rapidfuzz would be cheap anyway
+    monkeypatch.setattr(live, "_lev_sim", boom)
+    assert Matcher("fuzzy", KB).best_match("សួស្តី " * 200) is None
@@ -0,0 +1,50 @@
+# Khmer segmentation: utils/trie.py + utils/segment.py
+from utils.segment import Segmenter, STOPWORDS, load_wordlist
+from utils.trie import Trie
+
+def test_trie_contains_and_len():
+    t = Trie(["សាលា", "សាលារៀន", "សាលា"])
+    assert "សាលា" in t and "សាលារៀន" in t
+    assert "សា" not in t and "" not in t
+    assert len(t) == 2
+
+def test_trie_matches_yields_every_word_end():
+    t = Trie(["សាលា", "សាលារៀន", "រៀន"])
+    assert list(t.matches("សាលារៀនថ្មី")) == [4, 7]
+    assert list(t.matches("សាលារៀនថ្មី", 4)) == [7]
+    assert list(t.matches("ថ្មី")) == []
+
+def test_trie_prefix_items_dedup_and_keep():
+    t = Trie()
+    for i, w in enumerate(["ប្រឡង", "ប្រវត្តិ", "ប្រធាន"]):
+        t.add(w, item=i, keep=2)
+    t.add("ប្រឡង", item=0, keep=2)
+    assert t.prefix_items("ប្រ") == [0, 1]
+    assert t.prefix_items("ប្រឡ") == [0]
+    assert t.prefix_items("ក") == []
+
+def test_segment_wordlist():
+    seg = Segmenter(load_wordlist())
+    assert seg.segment("សិស្សរៀននៅសាលា") == ["សិស្ស", "រៀន", "នៅ", "សាលា"]
+    assert seg.segment("អគារ ICT") == ["អគារ", "ICT"]
+
+def test_segment_glues_unknown_clusters():
+    seg = Segmenter(["សាលា"])
+    assert seg.segment("ឆុំសុភក្តិសាលា") == ["ឆុំសុភក្តិ", "សាលា"]
+
+def test_content_words_drop_stopwords():
+    seg = Segmenter(load_wordlist())
+    words = seg.content_words("តើសិស្សមានប៉ុន្មាន")
+    assert words == ["សិស្ស"]
+    assert not STOPWORDS & set(words)
+
+def test_from_kb_learns_unknown_spans():
+    seg = Segmenter.from_kb({"ឆុំសុភក្តិជានរណា": ""})
+    assert "ឆុំសុភក្តិ" in seg.trie
+    assert seg.segment("លោកឆុំសុភក្តិ") == ["លោក", "ឆុំសុភក្តិ"]
+
+def test_from_kb_skips_single_cluster_labels():
+    seg = Segmenter.from_kb({f"អគារ {c} មានអ្វីខ្លះ": "" for c in "កខគឃង"})
+    assert "ក" not in seg.trie and "ង" not in seg.trie
+    assert seg.segment("កសិកម្ម") == ["កសិកម្ម"]
+    assert seg.segment("ឃ្លាំង") == ["ឃ្លាំង"]
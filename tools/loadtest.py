@@ -0,0 +1,296 @@
+# tools/loadtest.py
+# Offline load test: main.main() in webhook mode against stub Bot API + stub Gemini.
+#
+#   python -m tools.loadtest --rate 50 --duration 30 --gemini-latency 1.5
+#
+# Latency is end-to-end: webhook POST → the bot's reply reaching the stub Bot API.
+import os, sys, json, time, socket, logging, random, asyncio, argparse, tempfile, threading, subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOKEN = "123456:LOADTEST"
+DEFAULT_MIX = "offline=35,fuzzy=20,start=15,inline=10,gemini=20"
+# main.text_router's replies when Gemini fails; delivered fine, but not an answer
+GEMINI_ERROR_REPLIES = ("⚠️ កំហុស API", "❌ API មិនឆ្លើយតប")
+
+GEMINI_PROMPTS = [
+    "ពន្យល់ពីទ្រឹស្តីបទពីតាគ័រ",
+    "តើរូបវិទ្យាញូតុនមានច្បាប់អ្វីខ្លះ?",
+    "សរសេរកំណាព្យខ្លីអំពីសាលា",
+    "How do I balance a chemical equation?",
+    "តើធ្វើដូចម្តេចដើម្បីរៀនភាសាអង់គ្លេសឱ្យពូកែ?",
+]
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _pct(sorted_vals: list[float], p: float) -> float:
+    if not sorted_vals: return float("nan")
+    i = min(len(sorted_vals) - 1, max(0, round(p / 100 * len(sorted_vals)) - 1))
+    return sorted_vals[i]
+
+# ============ Stubs ============
+class _Stub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, handler, latency: float, error_rate: float):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.latency, self.error_rate = latency, error_rate
+        self.rng = random.Random()
+        self.calls = self.failed = 0
+
+    def delay(self) -> None:
+        if self.latency:
+            time.sleep(self.latency * self.rng.uniform(0.5, 1.5))
+
+    def fail(self) -> bool:
+        failed = self.rng.random() < self.error_rate
+        self.failed += failed
+        return failed
+
+    def start(self) -> "_Stub":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):  # quiet
+        pass
+
+    def _body(self) -> dict:
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        ctype = self.headers.get("Content-Type", "")
+        if "json" in ctype:
+            return json.loads(raw or b"{}")
+        if "form-urlencoded" in ctype:
+            return {k: v[0] for k, v in parse_qs(raw.decode("utf-8")).items()}
+        return {}
+
+    def _send(self, code: int, payload: dict) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+class _BotAPIHandler(_Handler):
+    """Answers every Bot API method; reports replies back to the load generator."""
+    def do_POST(self):
+        srv = self.server
+        method = self.path.rsplit("/", 1)[-1]
+        body = self._body()
+        srv.calls += 1
+        key = body.get("chat_id") or body.get("inline_query_id")
+        if method == "setWebhook":
+            srv.webhook_set.set()
+        srv.delay()
+        # errors hit replies only; a failed getMe/setWebhook would just stop the bot
+        if key is not None and srv.on_reply:
+            if srv.fail():
+                srv.on_reply(str(key), "error")  # the user never sees this reply
+                return self._send(500, {"ok": False, "error_code": 500, "description": "stub error"})
+            gemini_failed = str(body.get("text", "")).startswith(GEMINI_ERROR_REPLIES)
+            srv.on_reply(str(key), "gemini_error" if gemini_failed else "ok")
+        if method == "getMe":
+            result = {"id": 123456, "is_bot": True, "first_name": "LoadTest", "username": "loadtest_bot"}
+        elif method.startswith("send"):
+            chat = int(body.get("chat_id") or 0)
+            result = {"message_id": srv.calls, "date": int(time.time()),
+                      "chat": {"id": chat, "type": "private"}, "text": body.get("text", "")}
+        else:
+            result = True
+        self._send(200, {"ok": True, "result": result})
+
+    do_GET = do_POST
+
+class _GeminiHandler(_Handler):
+    def do_POST(self):
+        srv = self.server
+        self._body()
+        srv.calls += 1
+        srv.delay()
+        if srv.fail():
+            return self._send(500, {"error": {"code": 500, "message": "stub error", "status": "INTERNAL"}})
+        self._send(200, {"candidates": [{
+            "content": {"role": "model", "parts": [{"text": "🤖 (stub) ចម្លើយសាកល្បង"}]},
+            "finishReason": "STOP", "index": 0,
+        }]})
+
+# ============ Synthetic traffic ============
+def _corpus():
+    """Outline questions + deep-link payloads, straight from main.py."""
+    import main as bot
+    qs = bot._questions_from_outline()
+    return qs, [bot._qid(q) for q in qs]
+
+def _user(uid: int) -> dict:
+    return {"id": uid, "is_bot": False, "first_name": "Load"}
+
+def _message(uid: int, text: str) -> dict:
+    msg = {"message_id": uid, "date": int(time.time()), "text": text,
+           "chat": {"id": uid, "type": "private", "first_name": "Load"}, "from": _user(uid)}
+    if text.startswith("/"):
+        msg["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    return {"update_id": uid, "message": msg}
+
+def _make_update(kind: str, uid: int, rng: random.Random, questions, qids) -> dict:
+    if kind == "offline":
+        return _message(uid, rng.choice(questions))
+    if kind == "fuzzy":
+        q = "".join(rng.choice(questions).split()).rstrip("?")
+        i = rng.randrange(len(q))
+        return _message(uid, q[:i] + q[i + 1:])
+    if kind == "start":
+        return _message(uid, f"/start {rng.choice(qids)}")
+    if kind == "inline":
+        q = rng.choice(questions)
+        return {"update_id": uid, "inline_query": {
+            "id": str(uid), "from": _user(uid), "offset": "", "query": q[:rng.randint(1, len(q))]}}
+    return _message(uid, f"{rng.choice(GEMINI_PROMPTS)} #{uid}")
+
+def _parse_mix(spec: str) -> tuple[list[str], list[float]]:
+    kinds, weights = [], []
+    for part in spec.split(","):
+        k, _, w = part.partition("=")
+        kinds.append(k.strip())
+        weights.append(float(w or 1))
+    return kinds, weights
+
+async def _fire(args, webhook_url: str, bot_api: _Stub, questions, qids) -> dict:
+    loop = asyncio.get_running_loop()
+    waiters: dict[str, asyncio.Future] = {}
+
+    def on_reply(key: str, outcome: str = "ok"):  # called from stub threads
+        fut = waiters.get(key)
+        if fut:
+            done = (outcome, time.perf_counter())
+            loop.call_soon_threadsafe(lambda: fut.done() or fut.set_result(done))
+
+    bot_api.on_reply = on_reply
+    rng = random.Random(args.seed)
+    kinds, weights = _parse_mix(args.mix)
+    results = {k: {"lat": [], "ack": [], "timeout": 0, "error": 0, "gemini_error": 0} for k in kinds}
+
+    async def one(client, kind, uid):
+        update = _make_update(kind, uid, rng, questions, qids)
+        key = str(uid)
+        fut = waiters[key] = loop.create_future()
+        t0 = time.perf_counter()
+        r = results[kind]
+        try:
+            resp = await client.post(webhook_url, json=update)
+            r["ack"].append(time.perf_counter() - t0)
+            if resp.status_code != 200:
+                r["error"] += 1
+                return
+            outcome, done = await asyncio.wait_for(fut, args.timeout)
+            if outcome != "ok":  # injected Bot API error, or Gemini's error reply
+                r[outcome] += 1
+                return
+            r["lat"].append(done - t0)
+        except asyncio.TimeoutError:
+            r["timeout"] += 1
+        except httpx.HTTPError:
+            r["error"] += 1
+        finally:
+            waiters.pop(key, None)
+
+    limits = httpx.Limits(max_connections=args.connections)
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        tasks, interval = [], 1.0 / args.rate
+        start = time.perf_counter()
+        n = int(args.rate * args.duration)
+        for i in range(n):
+            delay = start + i * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            kind = rng.choices(kinds, weights)[0]
+            tasks.append(asyncio.create_task(one(client, kind, 1_000_000 + i)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    return {"results": results, "elapsed": elapsed, "sent": n}
+
+def _report(run: dict) -> None:
+    results, elapsed = run["results"], run["elapsed"]
+    print(f"\nsent {run['sent']} updates in {elapsed:.1f}s")
+    print(f"{'kind':<9}{'ok':>7}{'t/o':>6}{'err':>6}{'g.err':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ack p99':>10}")
+    every = []
+    for kind, r in results.items():
+        lat, ack = sorted(r["lat"]), sorted(r["ack"])
+        every += lat
+        print(f"{kind:<9}{len(lat):>7}{r['timeout']:>6}{r['error']:>6}{r['gemini_error']:>6}"
+              f"{_pct(lat,50)*1e3:>10.1f}{_pct(lat,95)*1e3:>10.1f}{_pct(lat,99)*1e3:>10.1f}"
+              f"{_pct(ack,99)*1e3:>10.1f}")
+    every.sort()
+    print(f"{'all':<9}{len(every):>7}{'':>18}{_pct(every,50)*1e3:>10.1f}"
+          f"{_pct(every,95)*1e3:>10.1f}{_pct(every,99)*1e3:>10.1f}")
+    print(f"throughput: {len(every) / elapsed:.1f} replies/s")
+
+# ============ Boot ============
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Offline load test for the webhook bot.")
+    ap.add_argument("--rate", type=float, default=20, help="updates per second")
+    ap.add_argument("--duration", type=float, default=15, help="seconds of traffic")
+    ap.add_argument("--mix", default=DEFAULT_MIX, help=f"kind=weight,... (default {DEFAULT_MIX})")
+    ap.add_argument("--gemini-latency", type=float, default=1.0, help="mean seconds per Gemini call")
+    ap.add_argument("--gemini-error-rate", type=float, default=0.0)
+    ap.add_argument("--tg-latency", type=float, default=0.02, help="mean seconds per Bot API call")
+    ap.add_argument("--tg-error-rate", type=float, default=0.0)
+    ap.add_argument("--timeout", type=float, default=30, help="seconds to wait for a reply")
+    ap.add_argument("--connections", type=int, default=100)
+    ap.add_argument("--port", type=int, default=0, help="webhook port (default: any free)")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    bot_api = _Stub(_BotAPIHandler, args.tg_latency, args.tg_error_rate)
+    bot_api.on_reply, bot_api.webhook_set = None, threading.Event()
+    gemini = _Stub(_GeminiHandler, args.gemini_latency, args.gemini_error_rate)
+    bot_api.start(); gemini.start()
+
+    port = args.port or _free_port()
+    env = dict(os.environ,
+               TELEGRAM_BOT_TOKEN=TOKEN, GEMINI_API_KEY="loadtest",
+               TELEGRAM_API_URL=bot_api.url, GEMINI_API_ENDPOINT=gemini.url,
+               WEBHOOK_BASE_URL=f"http://127.0.0.1:{port}", PORT=str(port), FORCE_POLLING="",
+               QA_LOG_PATH=os.path.join(tempfile.gettempdir(), f"loadtest-qa-{os.getpid()}.csv"))
+    os.environ.update(TELEGRAM_BOT_TOKEN=TOKEN)
+    sys.path.insert(0, ROOT)
+    questions, qids = _corpus()
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # main.py sets INFO
+
+    log = tempfile.NamedTemporaryFile("w", prefix="loadtest-bot-", suffix=".log", delete=False)
+    print(f"bot log: {log.name}")
+    proc = subprocess.Popen([sys.executable, "-c", "import main; main.main()"],
+                            cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    try:
+        if not bot_api.webhook_set.wait(30):
+            raise SystemExit("bot did not register its webhook within 30s (see log)")
+        time.sleep(0.5)  # setWebhook comes right after the server starts listening
+        webhook_url = f"http://127.0.0.1:{port}/telegram/{TOKEN}"
+        run = asyncio.run(_fire(args, webhook_url, bot_api, questions, qids))
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        bot_api.shutdown(); gemini.shutdown()
+        if os.path.exists(env["QA_LOG_PATH"]):
+            os.remove(env["QA_LOG_PATH"])  # keep synthetic misses out of logs/qa_events.csv
+    _report(run)
+    print(f"stub calls: bot api {bot_api.calls} ({bot_api.failed} failed), "
+          f"gemini {gemini.calls} ({gemini.failed} failed, client retries included)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# tools/pregenerate.py
+# Batch job: cluster frequent offline misses from logs/qa_events.csv and
+# pre-generate Gemini answers into a staging KB for review.
+#
+#   python -m tools.pregenerate --min-count 5 --top 50       # → offline/schoolinfo.staging.json
+#   python -m tools.pregenerate --merge                      # staging → offline/schoolinfo.json
+import os, sys, csv, json, asyncio, argparse
+from collections import Counter, defaultdict
+from dotenv import load_dotenv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from handlers.analytics import LOG_PATH
+from handlers.normalize import normalize
+from utils.gemini import make_model
+from utils.matcher import best_match, _char_ngrams, _jaccard
+
+KB_PATH = os.path.join(ROOT, "offline", "schoolinfo.json")
+STAGING_PATH = os.path.join(ROOT, "offline", "schoolinfo.staging.json")
+
+def _read_json(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _write_json(path: str, data: dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+
+# ============ Clustering ============
+def read_misses(path: str, kinds: set[str]) -> tuple[Counter, dict[str, Counter]]:
+    """Counts per normalized query, plus the raw spellings seen for each."""
+    counts: Counter = Counter()
+    raw: dict[str, Counter] = defaultdict(Counter)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if len(row) < 3 or row[1] not in kinds:
+                continue
+            q = normalize(row[2])
+            if len(q) < 3:
+                continue
+            counts[q] += 1
+            raw[q][row[2].strip()] += 1
+    return counts, raw
+
+def cluster(counts: Counter, similarity: float, limit: int = 5000) -> list[tuple[str, int, list[str]]]:
+    """Greedy: most frequent query opens a cluster, near-duplicates join it.
+
+    Returns [(head, total_count, members), ...] sorted by count.
+    """
+    heads: list[tuple[str, set[str]]] = []
+    totals: dict[str, int] = {}
+    members: dict[str, list[str]] = {}
+    for q, c in counts.most_common(limit):
+        g = _char_ngrams(q)
+        for head, hg in heads:
+            if _jaccard(g, hg) >= similarity:
+                totals[head] += c
+                members[head].append(q)
+                break
+        else:
+            heads.append((q, g))
+            totals[q], members[q] = c, [q]
+    return sorted(((h, totals[h], members[h]) for h, _ in heads), key=lambda x: -x[1])
+
+# ============ Gemini ============
+def _model():
+    load_dotenv(os.path.join(ROOT, ".env"))
+    key = (os.getenv("GEMINI_API_KEY") or "").strip()
+    if not key:
+        raise SystemExit("⚠️ Missing GEMINI_API_KEY")
+    # same model, prompt and endpoint override as main.text_router
+    return make_model(key, (os.getenv("GEMINI_API_ENDPOINT") or "").strip())
+
+async def generate(questions: list[str], concurrency: int) -> dict[str, str]:
+    model = _model()
+    sem = asyncio.Semaphore(concurrency)
+    out: dict[str, str] = {}
+
+    async def one(q: str):
+        async with sem:
+            try:
+                resp = await asyncio.to_thread(model.generate_content, q)
+                answer = (resp.text or "").strip()
+            except Exception as e:
+                print(f"⚠️ {q!r}: {e}", file=sys.stderr)
+                return
+        if answer:
+            out[q] = answer
+            print(f"✅ {q}")
+
+    await asyncio.gather(*(one(q) for q in questions))
+    return {q: out[q] for q in questions if q in out}  # keep frequency order
+
+# ============ Merge ============
+def merge(staging_path: str, kb_path: str) -> None:
+    # only the staged answers go into kb_path; utils.matcher overlays it on offline/offline.py
+    staged = _read_json(staging_path)
+    if not staged:
+        raise SystemExit(f"Nothing staged in {staging_path}")
+    kb = _read_json(kb_path)
+    added = [q for q in staged if q not in kb]
+    kb.update(staged)
+    _write_json(kb_path, kb)
+    os.remove(staging_path)
+    print(f"merged {len(staged)} answers ({len(added)} new) into {kb_path}")
+
+# ============ Boot ============
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Pre-generate Gemini answers for frequent offline misses.")
+    ap.add_argument("--log", default=LOG_PATH, help="analytics CSV (handlers/analytics.py)")
+    ap.add_argument("--kinds", default="gemini", help="event kinds that count as misses")
+    ap.add_argument("--min-count", type=int, default=5, help="skip clusters asked fewer times")
+    ap.add_argument("--top", type=int, default=50, help="max clusters to generate")
+    ap.add_argument("--similarity", type=float, default=0.6, help="trigram Jaccard to join a cluster")
+    ap.add_argument("--concurrency", type=int, default=4, help="parallel Gemini calls")
+    ap.add_argument("--out", default=STAGING_PATH)
+    ap.add_argument("--kb", default=KB_PATH)
+    ap.add_argument("--dry-run", action="store_true", help="print clusters, do not call Gemini")
+    ap.add_argument("--merge", action="store_true", help="merge --out into --kb and remove it")
+    args = ap.parse_args(argv)
+
+    if args.merge:
+        return merge(args.out, args.kb)
+    if not os.path.exists(args.log):
+        raise SystemExit(f"No analytics log at {args.log}")
+
+    counts, raw = read_misses(args.log, set(args.kinds.split(",")))
+    staged = _read_json(args.out)
+    known = {normalize(k) for k in staged}
+    picked = []
+    for head, total, members in cluster(counts, args.similarity):
+        if total < args.min_count:
+            break
+        # the bot already answers it (main.text_router's fuzzy step, typos included), or it is staged
+        if any(m in known or best_match(m) for m in members):
+            continue
+        # display the spelling users actually typed most often
+        question = max(((s, c) for m in members for s, c in raw[m].items()), key=lambda x: x[1])[0]
+        picked.append((question, total, len(members)))
+        if len(picked) >= args.top:
+            break
+
+    print(f"{sum(counts.values())} misses, {len(counts)} distinct, {len(picked)} clusters to generate")
+    for q, total, n in picked:
+        print(f"{total:6d}  ({n} variants)  {q}")
+    if args.dry_run or not picked:
+        return
+
+    answers = asyncio.run(generate([q for q, _, _ in picked], args.concurrency))
+    staged.update(answers)
+    _write_json(args.out, staged)
+    print(f"staged {len(answers)} new answers → {args.out} (review, then --merge)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# utils/bm25.py
+# Token-level inverted index with Okapi BM25 ranking
+from collections import Counter
+from math import log
+
+
+class BM25Index:
+    def __init__(self, docs: list[list[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1, self.b = k1, b
+        self.n = len(docs)
+        lens = [len(d) for d in docs]
+        avgdl = (sum(lens) / self.n) if self.n else 0.0
+        # per-doc length normalisation, computed once
+        self._norm = [k1 * (1 - b + b * (dl / avgdl if avgdl else 0.0)) for dl in lens]
+
+        postings: dict[str, list[tuple[int, int]]] = {}
+        for i, toks in enumerate(docs):
+            for tok, tf in Counter(toks).items():
+                postings.setdefault(tok, []).append((i, tf))
+        self.postings = postings
+        self.idf = {
+            tok: log(1 + (self.n - len(p) + 0.5) / (len(p) + 0.5))
+            for tok, p in postings.items()
+        }
+
+    def idf_sum(self, query: list[str]) -> float:
+        """Sum of query IDFs; tokens missing from the index count at full (df=0) IDF."""
+        unseen = log(1 + (self.n + 0.5) / 0.5)
+        return sum(self.idf.get(tok, unseen) for tok in set(query))
+
+    def search(self, query: list[str], k: int | None = None) -> list[tuple[float, int]]:
+        """Return [(score, doc_index), ...] best first; only docs sharing a token."""
+        scores: dict[int, float] = {}
+        k1 = self.k1
+        for tok in set(query):
+            plist = self.postings.get(tok)
+            if not plist:
+                continue
+            idf = self.idf[tok]
+            for i, tf in plist:
+                scores[i] = scores.get(i, 0.0) + idf * tf * (k1 + 1) / (tf + self._norm[i])
+        ranked = sorted(((s, i) for i, s in scores.items()), reverse=True)
+        return ranked[:k] if k else ranked
@@ -0,0 +1,90 @@
+# utils/chat_memory.py
+# Bounded per-conversation history for Gemini (ring buffer + LRU/TTL)
+import time
+from collections import OrderedDict, deque
+from typing import Hashable
+
+
+def approx_tokens(text: str) -> int:
+    # rough: Khmer tokenizes denser than English, ~3 chars per token
+    return len(text) // 3 + 1
+
+
+class _Turn:
+    __slots__ = ("role", "text", "tokens")
+
+    def __init__(self, role: str, text: str):
+        self.role = role
+        self.text = text
+        self.tokens = approx_tokens(text)
+
+
+class _Session:
+    __slots__ = ("turns", "tokens", "seen")
+
+    def __init__(self, max_turns: int, now: float):
+        self.turns: deque[_Turn] = deque(maxlen=max_turns)
+        self.tokens = 0
+        self.seen = now
+
+
+class ChatMemory:
+    def __init__(self, max_turns: int = 8, max_tokens: int = 2000,
+                 max_users: int = 5000, ttl: float = 1800, clock=time.monotonic):
+        # turns come in user+model pairs: 0 disables memory, odd rounds up
+        self.max_turns = max_turns + max_turns % 2 if max_turns > 0 else 0
+        self.max_tokens = max_tokens
+        self.max_users = max_users
+        self.ttl = ttl
+        self._clock = clock
+        self._sessions: OrderedDict[Hashable, _Session] = OrderedDict()  # oldest first
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict(self, now: float) -> None:
+        s = self._sessions
+        while s:
+            key, sess = next(iter(s.items()))
+            if len(s) <= self.max_users and now - sess.seen <= self.ttl:
+                break
+            del s[key]
+
+    def _get(self, key: Hashable, now: float) -> _Session | None:
+        sess = self._sessions.get(key)
+        if sess is None:
+            return None
+        if now - sess.seen > self.ttl:
+            del self._sessions[key]
+            return None
+        return sess
+
+    def history(self, key: Hashable) -> list[dict]:
+        """Past turns in generate_content format: [{"role", "parts"}, ...]."""
+        sess = self._get(key, self._clock())
+        if sess is None:
+            return []
+        return [{"role": t.role, "parts": [t.text]} for t in sess.turns]
+
+    def add_exchange(self, key: Hashable, prompt: str, answer: str) -> None:
+        if not self.max_turns:
+            return
+        now = self._clock()
+        sess = self._get(key, now)
+        if sess is None:
+            sess = self._sessions[key] = _Session(self.max_turns, now)
+        for turn in (_Turn("user", prompt), _Turn("model", answer)):
+            if len(sess.turns) == sess.turns.maxlen:
+                sess.tokens -= sess.turns[0].tokens  # deque drops it on append
+            sess.turns.append(turn)
+            sess.tokens += turn.tokens
+        # trim to budget; keep history starting on a user turn
+        turns = sess.turns
+        while turns and (sess.tokens > self.max_tokens or turns[0].role != "user"):
+            sess.tokens -= turns.popleft().tokens
+        sess.seen = now
+        self._sessions.move_to_end(key)
+        self._evict(now)
+
+    def clear(self, key: Hashable) -> None:
+        self._sessions.pop(key, None)
@@ -0,0 +1,17 @@
+# utils/gemini.py
+# Gemini client setup shared by main.py and tools/pregenerate.py, so live and
+# pre-generated answers come from the same model and prompt.
+PROMPT_PREFIX = "ជាអ្នកជំនួយផ្នែកសិក្សាដែលនិយាយភាសាខ្មែរ។ "
+MODEL_NAME = "gemini-1.5-flash"
+
+def make_model(api_key: str, endpoint: str = ""):
+    """Configure google-generativeai and return the bot's model.
+
+    endpoint overrides the API host (tools/loadtest.py stub); it needs REST transport.
+    """
+    import google.generativeai as genai
+    if endpoint:
+        genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": endpoint})
+    else:
+        genai.configure(api_key=api_key)
+    return genai.GenerativeModel(MODEL_NAME, system_instruction=PROMPT_PREFIX.strip())
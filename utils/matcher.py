@@ -1,21 +1,25 @@
 # utils/matcher.py
-import json, re, unicodedata, importlib.util
+# One KB, pluggable scoring presets (shared by offline/brain_school.py)
+import os, json, re, logging, unicodedata, importlib.util
 from pathlib import Path
-from typing import Dict
+from math import log
+from typing import Dict, NamedTuple
+
+from utils.bm25 import BM25Index
+from utils.segment import Segmenter, STOPWORDS
+
+try:
+    from rapidfuzz.distance import Levenshtein as _RF_LEV
+    _HAS_RF = True
+except Exception:
+    _HAS_RF = False
 
 def _load_offline() -> Dict[str, str]:
+    # offline/offline.py is the base (main.py's OFFLINE_QA, then OFFLINE); JSON
+    # files overlay it, schoolinfo.json (merged by tools/pregenerate.py) last
     here = Path(__file__).resolve()
     root = here.parent.parent  # repo root
-
-    candidates = [
-        root / "offline" / "schoolinfo.json",
-        root / "offline" / "offline.json",
-        root / "offline.json",
-    ]
-    for path in candidates:
-        if path.exists():
-            with path.open("r", encoding="utf-8") as f:
-                return json.load(f)
+    data: Dict[str, str] = {}
 
     py_mod = root / "offline" / "offline.py"
     if py_mod.exists():
@@ -23,19 +27,31 @@ def _load_offline() -> Dict[str, str]:
         mod = importlib.util.module_from_spec(spec)
         assert spec and spec.loader
         spec.loader.exec_module(mod)  # type: ignore
-        if hasattr(mod, "OFFLINE") and isinstance(mod.OFFLINE, dict):
-            return {str(k): str(v) for k, v in mod.OFFLINE.items()}
+        for name in ("OFFLINE_QA", "OFFLINE"):
+            if isinstance(getattr(mod, name, None), dict):
+                data.update({str(k): str(v) for k, v in getattr(mod, name).items()})
 
-    raise FileNotFoundError(
-        "No offline data found. Create offline/schoolinfo.json (or offline.json / offline/offline.py)."
-    )
+    candidates = [
+        root / "offline.json",
+        root / "offline" / "offline.json",
+        root / "offline" / "schoolinfo.json",
+    ]
+    for path in candidates:
+        if path.exists():
+            with path.open("r", encoding="utf-8") as f:
+                data.update(json.load(f))
+
+    if not data:
+        raise FileNotFoundError(
+            "No offline data found. Create offline/schoolinfo.json (or offline.json / offline/offline.py)."
+        )
+    return data
 
 OFFLINE: Dict[str, str] = _load_offline()
 
 # Khmer normalization
 _KH_DIGITS = str.maketrans("០១២៣៤៥៦៧៨៩", "0123456789")
 _PUNCT = r"[។៕៖,\.!?~\-_/\\()\[\]{}«»“”\"'`]|[‐-–—]+"
-_STOP = {"តើ", "ទេ", "មែនទេ", "អី", "អ្វី", "ឬ", "ញ៉ាំ", "ឬអត់"}
 
 def normalize(text: str) -> str:
     if not text:
@@ -47,10 +63,6 @@ def normalize(text: str) -> str:
     t = re.sub(_PUNCT, "", t)
     return unicodedata.normalize("NFC", t)
 
-def _strip_stopwords(t: str) -> str:
-    toks = [w for w in t.split() if w not in _STOP]
-    return " ".join(toks) if toks else t
-
 def _char_ngrams(s: str, n: int = 3) -> set[str]:
     if not s: return set()
     if len(s) < n: return {s}
@@ -64,6 +76,8 @@ def _lev_sim(a: str, b: str) -> float:
     if a == b: return 1.0
     la, lb = len(a), len(b)
     if la == 0 or lb == 0: return 0.0
+    if _HAS_RF:
+        return 1.0 - _RF_LEV.distance(a, b) / max(la, lb)
     dp = list(range(lb+1))
     for i, ca in enumerate(a, 1):
         prev = dp[0]; dp[0] = i
@@ -73,36 +87,188 @@ def _lev_sim(a: str, b: str) -> float:
     dist = dp[-1]
     return 1.0 - dist / max(la, lb)
 
+def _len_sim(a: str, b: str) -> float:
+    # cheap upper bound on _lev_sim (brain_school's historic no-rapidfuzz path)
+    if _HAS_RF: return _lev_sim(a, b)
+    return 1.0 - abs(len(a) - len(b)) / max(len(a), len(b), 1)
+
 _EXCLUDE_KEYS = {"សំណួរបែប Offline"}
 
 def get_offline_help_text() -> str:
     return OFFLINE.get("សំណួរបែប Offline", "")
 
-def best_match(user_text: str) -> dict | None:
-    q = _strip_stopwords(normalize(user_text))
-    if not q: return None
-    qg = _char_ngrams(q, 3)
-    best = {"key": None, "reply": None, "score": float("-inf")}
-    for key, reply in OFFLINE.items():
-        if key in _EXCLUDE_KEYS: continue
-        kn, rn = normalize(key), normalize(reply)
-        score = (
-            1.2*_jaccard(qg, _char_ngrams(kn,3)) +
-            0.6*_jaccard(qg, _char_ngrams(rn,3)) +
-            0.9*_lev_sim(q, kn)
+# ---------- Knowledge base: everything query-independent, computed once ----------
+_BM25_KEY_WEIGHT = 2   # key tokens count twice vs reply tokens
+
+class KnowledgeBase:
+    def __init__(self, data: Dict[str, str]):
+        self.data = data
+        self.seg = Segmenter.from_kb(data, normalize)
+        self.keys = [k for k in data if k not in _EXCLUDE_KEYS]
+        self.norm_keys = [normalize(k) for k in self.keys]
+        self.norm_replies = [normalize(data[k]) for k in self.keys]
+        self.key_grams = [_char_ngrams(k) for k in self.norm_keys]
+        self.reply_grams = [_char_ngrams(r) for r in self.norm_replies]
+        self.key_words = [set(self.seg.content_words(k)) for k in self.norm_keys]
+        self.key_tokens = [set(self.content_tokens(k)) for k in self.norm_keys]
+        self.max_key_len = max(map(len, self.norm_keys), default=0)
+        # IDF of content words over key+reply, so generic words (សាលា) boost less
+        docs = [self.key_words[i] | set(self.seg.content_words(r)) for i, r in enumerate(self.norm_replies)]
+        n = len(docs)
+        df: Dict[str, int] = {}
+        for d in docs:
+            for w in d:
+                df[w] = df.get(w, 0) + 1
+        unique = log(1 + (n - 0.5) / 1.5)  # IDF of a word found in a single entry
+        self.word_weight = {w: min(1.0, log(1 + (n - c + 0.5) / (c + 0.5)) / unique) for w, c in df.items()}
+        self._bm25: BM25Index | None = None
+
+    def strip_stopwords(self, t: str) -> str:
+        # Khmer has no spaces between words: segment each chunk, keep its spacing
+        chunks = ["".join(w for w in self.seg.segment(c) if w not in STOPWORDS) for c in t.split()]
+        chunks = [c for c in chunks if c]
+        return " ".join(chunks) if chunks else t
+
+    def content_tokens(self, t: str) -> list[str]:
+        return [w for w in self.seg.segment(t) if w not in STOPWORDS]
+
+    @property
+    def bm25(self) -> BM25Index:
+        if self._bm25 is None:
+            self._bm25 = BM25Index([
+                self.content_tokens(k) * _BM25_KEY_WEIGHT + self.content_tokens(r)
+                for k, r in zip(self.norm_keys, self.norm_replies)
+            ])
+        return self._bm25
+
+KB = KnowledgeBase(OFFLINE)
+
+# ---------- Scoring presets ----------
+class Preset(NamedTuple):
+    engine: str = "fuzzy"         # "fuzzy" (trigrams + Levenshtein) or "bm25"
+    key_ngram: float = 1.2        # weight: trigram Jaccard vs key
+    reply_ngram: float = 0.6      # weight: trigram Jaccard vs reply
+    lev: float = 0.9              # weight: Levenshtein similarity vs key
+    boost: float = 0.0            # weight: brain_school keyword boost
+    threshold: float = 1.05       # min score for best_match
+    min_key_overlap: int = 1      # bm25: query tokens that must also be in the key
+    stopwords: bool = True        # strip STOPWORDS from the query first
+    fast_lev: bool = False        # length bound instead of Levenshtein without rapidfuzz
+    suggest_k: int = 4
+
+PRESETS: Dict[str, Preset] = {
+    # former utils/matcher.best_match
+    "fuzzy": Preset(),
+    # former offline/brain_school.best_match
+    "brain_school": Preset(boost=1.0, threshold=1.35, stopwords=False, fast_lev=True, suggest_k=3),
+    # token inverted index, see utils/bm25.py
+    # score = raw BM25 / sum of query IDFs, so the threshold is scale-free
+    "bm25": Preset(engine="bm25", threshold=0.6),
+}
+
+def _keyword_boost(kb: KnowledgeBase, i: int, q: str, q_words: set[str]) -> float:
+    k, r = kb.norm_keys[i], kb.norm_replies[i]
+    score = 0.0
+    if q and (q in k or k in q):
+        score += 0.7
+    if q and q in r:
+        score += 0.4
+    shared = q_words & kb.key_words[i]
+    if shared:
+        score += 0.6 * max(kb.word_weight.get(w, 1.0) for w in shared)
+    return score
+
+class Matcher:
+    def __init__(self, preset: str | Preset = "fuzzy", kb: KnowledgeBase | None = None):
+        self.preset = PRESETS[preset] if isinstance(preset, str) else preset
+        self.kb = kb or KB
+
+    def _query(self, user_text: str) -> str:
+        q = normalize(user_text)
+        return self.kb.strip_stopwords(q) if self.preset.stopwords else q
+
+    def score(self, user_text: str, k: int | None = None) -> list[dict]:
+        """Every candidate, best first: {key, reply, score, parts: {component: weighted score}}."""
+        p, kb = self.preset, self.kb
+        q = self._query(user_text)
+        if not q:
+            return []
+        out = []
+        if p.engine == "bm25":
+            toks = kb.content_tokens(q)
+            if not toks:
+                return []
+            q_toks, idf_sum = set(toks), kb.bm25.idf_sum(toks)
+            for s, i in kb.bm25.search(toks):
+                overlap = len(q_toks & kb.key_tokens[i])
+                if overlap < p.min_key_overlap:
+                    continue
+                key = kb.keys[i]
+                out.append({"key": key, "reply": kb.data[key], "score": s / idf_sum,
+                            "parts": {"bm25": s, "idf_sum": idf_sum, "key_overlap": overlap}})
+            return out[:k] if k else out
+
+        qg = _char_ngrams(q)
+        q_words = set(kb.seg.content_words(q)) if p.boost else set()
+        # Levenshtein is O(len(q) * len(key)); a message far longer than any key
+        # cannot be close to one, so long ones only get the length bound
+        lev = _len_sim if p.fast_lev or len(q) > 2 * kb.max_key_len else _lev_sim
+        for i, key in enumerate(kb.keys):
+            parts = {
+                "key_ngram": p.key_ngram * _jaccard(qg, kb.key_grams[i]),
+                "reply_ngram": p.reply_ngram * _jaccard(qg, kb.reply_grams[i]),
+                "lev": p.lev * lev(q, kb.norm_keys[i]),
+            }
+            if p.boost:
+                parts["boost"] = p.boost * _keyword_boost(kb, i, q, q_words)
+            out.append({"key": key, "reply": kb.data[key], "score": sum(parts.values()), "parts": parts})
+        out.sort(key=lambda c: c["score"], reverse=True)
+        return out[:k] if k else out
+
+    def best_match(self, user_text: str, explain: bool = False) -> dict | None:
+        """Return dict {key, reply, score} (plus parts if explain) or None."""
+        cands = self.score(user_text, k=1)
+        if not cands or cands[0]["score"] < self.preset.threshold:
+            return None
+        best = cands[0]
+        return best if explain else {"key": best["key"], "reply": best["reply"], "score": best["score"]}
+
+    def match_many(self, texts: list[str], explain: bool = False) -> list[dict | None]:
+        """best_match for a batch; repeated queries are scored once."""
+        seen: dict[str, dict | None] = {}
+        out = []
+        for t in texts:
+            q = self._query(t)
+            if q not in seen:
+                seen[q] = self.best_match(t, explain)
+            out.append(seen[q])
+        return out
+
+    def top_suggestions(self, user_text: str, k: int | None = None) -> list[str]:
+        """Top-k closest keys (trigram Jaccard vs key) for guidance."""
+        grams_q = _char_ngrams(self._query(user_text))
+        if not grams_q: return []
+        scored = sorted(
+            ((_jaccard(grams_q, g), key) for g, key in zip(self.kb.key_grams, self.kb.keys)),
+            reverse=True,
         )
-        if score > best["score"]:
-            best = {"key": key, "reply": reply, "score": score}
-    return best if best["key"] and best["score"] >= 1.05 else None
+        return [key for _, key in scored[:k or self.preset.suggest_k]]
+
+# ---------- Module-level API (default preset) ----------
+MATCHER_ENGINE = (os.getenv("MATCHER_ENGINE") or "fuzzy").strip().lower()
+if MATCHER_ENGINE not in PRESETS:
+    logging.getLogger(__name__).warning(
+        "Unknown MATCHER_ENGINE=%r (expected one of %s); using 'fuzzy'.",
+        MATCHER_ENGINE, ", ".join(PRESETS),
+    )
+    MATCHER_ENGINE = "fuzzy"
+_DEFAULT = Matcher(MATCHER_ENGINE)
+
+def best_match(user_text: str) -> dict | None:
+    return _DEFAULT.best_match(user_text)
+
+def match_many(texts: list[str]) -> list[dict | None]:
+    return _DEFAULT.match_many(texts)
 
 def top_suggestions(user_text: str, k: int = 4) -> list[str]:
-    q = _strip_stopwords(normalize(user_text))
-    grams_q = _char_ngrams(q, 3)
-    if not grams_q: return []
-    scored = []
-    for key in OFFLINE.keys():
-        if key in _EXCLUDE_KEYS: continue
-        grams_k = _char_ngrams(normalize(key), 3)
-        scored.append((_jaccard(grams_q, grams_k), key))
-    scored.sort(reverse=True)
-    return [key for _, key in scored[:k]]
+    return _DEFAULT.top_suggestions(user_text, k)
@@ -0,0 +1,103 @@
+# utils/profiler.py
+# On-demand profilers for the running bot (cProfile or a stack sampler).
+# Nothing here runs until start() is called.
+import sys, time, marshal, cProfile, pstats, threading
+from collections import Counter
+
+
+def _where(code_or_key) -> str:
+    if isinstance(code_or_key, tuple):  # pstats key: (file, line, func)
+        file, line, func = code_or_key
+    else:
+        file, line, func = code_or_key.co_filename, code_or_key.co_firstlineno, code_or_key.co_name
+    if file == "~":
+        return func  # builtins
+    parts = file.replace("\\", "/").rsplit("/", 2)
+    return f"{func} ({'/'.join(parts[-2:])}:{line})"
+
+
+class CProfileSession:
+    """Deterministic profile of the event-loop thread."""
+    mode, ext = "cprofile", "prof"
+
+    def __init__(self):
+        self._prof = cProfile.Profile()
+        self.started = self.stopped = 0.0
+
+    def start(self) -> None:
+        self.started = time.monotonic()
+        self._prof.enable()
+
+    def stop(self) -> None:
+        self._prof.disable()
+        self.stopped = time.monotonic()
+
+    def top(self, n: int = 15) -> list[str]:
+        st = pstats.Stats(self._prof)
+        rows = sorted(st.stats.items(), key=lambda kv: kv[1][2], reverse=True)[:n]
+        out = ["self ms   total ms    calls  function"]
+        for key, (_cc, nc, tt, ct, _callers) in rows:
+            out.append(f"{tt*1e3:7.1f} {ct*1e3:10.1f} {nc:8d}  {_where(key)}")
+        return out
+
+    def dump(self) -> bytes:
+        """Same bytes as Profile.dump_stats(); open with pstats / snakeviz."""
+        self._prof.create_stats()
+        return marshal.dumps(self._prof.stats)
+
+
+class SamplingSession:
+    """Samples the event-loop thread's stack every `interval` seconds."""
+    mode, ext = "sample", "folded"
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.samples = 0
+        self.started = self.stopped = 0.0
+        self._target = 0
+        self._halt = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._target = threading.get_ident()  # call from the loop thread
+        self.started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._halt.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                stack.append(_where(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    def stop(self) -> None:
+        self._halt.set()
+        if self._thread:
+            self._thread.join()
+        self.stopped = time.monotonic()
+
+    def top(self, n: int = 15) -> list[str]:
+        own, total = Counter(), Counter()
+        for stack, c in self.stacks.items():
+            own[stack[-1]] += c
+            for fn in set(stack):
+                total[fn] += c
+        n_all = max(self.samples, 1)
+        out = ["self %  total %  function"]
+        for fn, c in own.most_common(n):
+            out.append(f"{100*c/n_all:6.1f} {100*total[fn]/n_all:8.1f}  {fn}")
+        return out
+
+    def dump(self) -> bytes:
+        """Folded stacks (flamegraph.pl / speedscope)."""
+        lines = (";".join(s) + f" {c}" for s, c in self.stacks.most_common())
+        return "\n".join(lines).encode("utf-8")
+
+
+SESSIONS = {"cprofile": CProfileSession, "sample": SamplingSession}
@@ -0,0 +1,117 @@
+# utils/segment.py
+# Dictionary-based Khmer word segmentation (trie + maximal matching)
+import re
+from pathlib import Path
+from typing import Iterable
+
+from utils.trie import Trie
+
+WORDLIST_PATH = Path(__file__).resolve().parent / "khmer_words.txt"
+
+# One orthographic cluster: base letter + subscripts (coeng) + vowels/signs.
+# Words never split a cluster, so matching runs on cluster boundaries only.
+_CLUSTER = re.compile(r"[ក-ឳ](?:្[ក-ឳ]|[឴-៑៓៝])*")
+_RUN = re.compile(r"[ក-៿]+|[^ក-៿\s]+")
+_KHMER = re.compile(r"[ក-៿]")
+
+# The one stopword list: matcher query stripping, BM25 and keyword boost all use it.
+STOPWORDS = frozenset({
+    "តើ", "ទេ", "មែនទេ", "អី", "អ្វី", "ឬ", "ឬអត់", "ខ្លះ", "មាន", "ជា",
+    "នរណា", "អ្នកណា", "ប៉ុន្មាន", "បាន", "អាច", "នៅ", "និង", "ដែល", "ញ៉ាំ",
+    "ខ្ញុំ", "អ្នក", "គាត់", "យើង",
+})
+
+def load_wordlist(path: Path = WORDLIST_PATH) -> list[str]:
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8") as f:
+        return [w for line in f if (w := line.strip()) and not w.startswith("#")]
+
+def _clusters(run: str) -> list[int]:
+    """Cluster start offsets of a Khmer run, plus the final end offset."""
+    bounds, pos = [], 0
+    while pos < len(run):
+        m = _CLUSTER.match(run, pos)
+        bounds.append(pos)
+        pos = m.end() if m else pos + 1
+    bounds.append(len(run))
+    return bounds
+
+class Segmenter:
+    def __init__(self, words: Iterable[str] = ()):
+        self.trie = Trie(words)
+
+    @classmethod
+    def from_kb(cls, kb: dict, normalize=None) -> "Segmenter":
+        """Bundled word list + whatever spans of the KB keys it cannot segment.
+
+        Single-cluster spans (labels like អគារ ក) are not learned: as words they
+        would win maximal matching and split ordinary words (ក|សិ|ក|ម្ម).
+        """
+        seg = cls(load_wordlist())
+        for key in kb:
+            key = normalize(key) if normalize else key
+            for tok in seg.segment(key):
+                if _KHMER.match(tok) and tok not in seg.trie and len(_clusters(tok)) > 2:
+                    seg.trie.add(tok)
+        return seg
+
+    def _segment_khmer(self, run: str) -> list[str]:
+        # Maximal matching: fewest unknown clusters first, then fewest words.
+        bounds = _clusters(run)
+        at = {off: i for i, off in enumerate(bounds)}
+        n = len(bounds) - 1
+        best: list = [None] * (n + 1)  # (unknown, words, prev, is_word)
+        best[0] = (0, 0, -1, True)
+        for i in range(n):
+            if best[i] is None:
+                continue
+            unk, cnt = best[i][0], best[i][1]
+            for end in self.trie.matches(run, bounds[i]):
+                j = at.get(end)
+                if j is not None and (best[j] is None or (unk, cnt + 1) < best[j][:2]):
+                    best[j] = (unk, cnt + 1, i, True)
+            if best[i + 1] is None or (unk + 1, cnt + 1) < best[i + 1][:2]:
+                best[i + 1] = (unk + 1, cnt + 1, i, False)
+
+        spans, j = [], n
+        while j > 0:
+            _, _, i, is_word = best[j]
+            spans.append((i, j, is_word))
+            j = i
+        spans.reverse()
+
+        # glue neighbouring unknown clusters back into one token
+        out: list[str] = []
+        prev_unknown = False
+        for i, j, is_word in spans:
+            piece = run[bounds[i]:bounds[j]]
+            if not is_word and prev_unknown:
+                out[-1] += piece
+            else:
+                out.append(piece)
+            prev_unknown = not is_word
+        return out
+
+    def segment(self, text: str) -> list[str]:
+        """Split (already normalized) text into words."""
+        toks: list[str] = []
+        for m in _RUN.finditer(text or ""):
+            run = m.group(0)
+            if _KHMER.match(run):
+                toks.extend(self._segment_khmer(run))
+            else:
+                toks.append(run)
+        return toks
+
+    def content_words(self, text: str) -> list[str]:
+        return [t for t in self.segment(text) if t not in STOPWORDS]
+
+_DEFAULT: Segmenter | None = None
+
+def segment(text: str) -> list[str]:
+    """Segment with the bundled word list only."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = Segmenter(load_wordlist())
+    return _DEFAULT.segment(text)
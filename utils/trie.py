@@ -0,0 +1,69 @@
+# utils/trie.py
+# Minimal character trie (Khmer segmenter, inline typeahead)
+from typing import Iterator
+
+
+class _Node:
+    __slots__ = ("children", "terminal", "items")
+
+    def __init__(self):
+        self.children: dict[str, "_Node"] = {}
+        self.terminal = False
+        self.items: list | None = None  # ranked payloads under this prefix
+
+
+class Trie:
+    def __init__(self, words=()):
+        self.root = _Node()
+        self.size = 0
+        for w in words:
+            self.add(w)
+
+    def add(self, word: str, item=None, keep: int = 0) -> None:
+        """Insert word; with item, also record it on every prefix node (at most keep)."""
+        if not word:
+            return
+        node = self.root
+        for ch in word:
+            nxt = node.children.get(ch)
+            if nxt is None:
+                nxt = node.children[ch] = _Node()
+            node = nxt
+            if item is not None:
+                if node.items is None:
+                    node.items = []
+                if item not in node.items and (not keep or len(node.items) < keep):
+                    node.items.append(item)
+        if not node.terminal:
+            node.terminal = True
+            self.size += 1
+
+    def __contains__(self, word: str) -> bool:
+        node = self._find(word)
+        return bool(node and node.terminal)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _find(self, prefix: str):
+        node = self.root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def prefix_items(self, prefix: str) -> list:
+        """Items recorded under prefix, in insertion order."""
+        node = self._find(prefix)
+        return list(node.items) if node and node.items else []
+
+    def matches(self, s: str, start: int = 0) -> Iterator[int]:
+        """Yield end offsets of every dictionary word that starts at s[start]."""
+        node = self.root
+        for i in range(start, len(s)):
+            node = node.children.get(s[i])
+            if node is None:
+                return
+            if node.terminal:
+                yield i + 1
@@ -0,0 +1,47 @@
+# utils/typeahead.py
+# Prefix-trie typeahead over KB questions, with a trigram fuzzy fallback
+from typing import Callable
+
+from utils.matcher import _char_ngrams, _jaccard
+from utils.segment import Segmenter
+from utils.trie import Trie
+
+_FUZZY_MIN = 0.2
+
+def _key(text: str) -> str:
+    # users rarely type the spaces between Khmer words
+    return "".join(text.lower().split())
+
+class Typeahead:
+    def __init__(self, entries: list[tuple[str, str]], normalize: Callable[[str], str],
+                 segmenter: Segmenter | None = None, keep: int = 10):
+        """entries = [(question, answer), ...]; search() returns indexes into it."""
+        self.entries = entries
+        self.normalize = normalize
+        self.trie = Trie()
+        keys = [_key(normalize(q)) for q, _ in entries]
+        self._grams = [_char_ngrams(k) for k in keys]
+
+        # whole questions first, so "starts with" outranks "contains a word starting with"
+        for i, k in enumerate(keys):
+            self.trie.add(k, i, keep)
+        if segmenter:
+            for i, k in enumerate(keys):
+                off = 0
+                for w in segmenter.segment(k)[:-1]:
+                    off += len(w)
+                    self.trie.add(k[off:], i, keep)
+
+    def search(self, query: str, k: int = 8) -> list[int]:
+        qk = _key(self.normalize(query))
+        if not qk:
+            return list(range(min(k, len(self.entries))))
+        hits = self.trie.prefix_items(qk)[:k]
+        if len(hits) < k:
+            qg = _char_ngrams(qk)
+            scored = sorted(
+                ((_jaccard(qg, g), i) for i, g in enumerate(self._grams) if i not in hits),
+                reverse=True,
+            )
+            hits += [i for s, i in scored[:k - len(hits)] if s >= _FUZZY_MIN]
+        return hits